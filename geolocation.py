@@ -4,22 +4,44 @@ Geolocation functionality using IP-based lookup.
 Provides device location data for capture metadata.
 """
 
-import subprocess
+import http.client
 import json
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, Tuple
+
+# Device location changes on the scale of hours, so reuse a lookup for a while;
+# failures are retried sooner so a brief outage doesn't hide location for long
+LOCATION_TTL_S = 300.0
+LOCATION_FAILURE_TTL_S = 60.0
+
+# (monotonic time of the lookup, result)
+_cached_location: Optional[Tuple[float, Optional[Dict[str, Any]]]] = None
 
 
 def get_device_location() -> Optional[Dict[str, Any]]:
-    """Get device location using IP-based geolocation."""
+    """Get device location using IP-based geolocation, cached for a few minutes."""
+    global _cached_location
+    now = time.monotonic()
+    if _cached_location is not None:
+        fetched_at, location = _cached_location
+        ttl = LOCATION_TTL_S if location is not None else LOCATION_FAILURE_TTL_S
+        if now - fetched_at < ttl:
+            return dict(location) if location is not None else None
+
+    location = _fetch_location()
+    _cached_location = (now, location)
+    return dict(location) if location is not None else None
+
+
+def _fetch_location() -> Optional[Dict[str, Any]]:
+    conn = None
     try:
-        result = subprocess.run(
-            ["curl", "-s", "http://ip-api.com/json/"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-        if result.returncode == 0:
-            data = json.loads(result.stdout)
+        # Plain in-process request; ~200 bytes isn't worth spawning curl for
+        conn = http.client.HTTPConnection("ip-api.com", timeout=5)
+        conn.request("GET", "/json/")
+        resp = conn.getresponse()
+        if resp.status == 200:
+            data = json.loads(resp.read())
             if data.get("status") == "success":
                 return {
                     "latitude": data.get("lat"),
@@ -30,6 +52,9 @@ def get_device_location() -> Optional[Dict[str, Any]]:
                 }
     except Exception as e:
         print(f"Geolocation failed: {e}")
+    finally:
+        if conn is not None:
+            conn.close()
     return None
 
 
@@ -4,39 +4,260 @@ Safe markdown file writer with backup and conflict resolution.
 Handles writing captures to daily markdown files in the vault.
 """
 
+import errno
+import json
 import os
+import queue
+import re
+import secrets
 import shutil
+import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import yaml
 
+# Frontmatter parsing dominates read_idea_file, so use libyaml when PyYAML has it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# How hard atomic_write works to make a capture survive a crash or power loss:
+#   "none" - write and rename only; the kernel flushes when it likes
+#   "file" - also fdatasync the temp file before renaming it into place
+#   "dir"  - also fsync the capture directory so the rename itself is durable
+DURABILITY_LEVELS = ("none", "file", "dir")
+
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+# Most queued captures the writer thread takes in one batch (write_capture_async)
+WRITE_BATCH_SIZE = 64
+
+# Characters PyYAML refuses to read (yaml.reader.Reader.NON_PRINTABLE), plus the
+# YAML 1.1 line breaks NEL/LS/PS, which it would fold inside quoted scalars
+_YAML_UNSAFE_RE = re.compile(
+    "[^\x09\x0A\x0D\x20-\x7E\xA0-\u2027\u202A-\uD7FF\uE000-\uFFFD\U00010000-\U0010FFFF]"
+)
+
+
+def _reads_back_from_json(value: Any) -> bool:
+    """Whether YAML parses json.dumps(value) back to the same value.
+
+    PyYAML only resolves floats written with a decimal point (so not 1e-05,
+    nan or inf), and JSON would silently stringify non-string mapping keys.
+    """
+    if isinstance(value, float):
+        return "." in repr(value)
+    if isinstance(value, list):
+        return all(_reads_back_from_json(v) for v in value)
+    if isinstance(value, dict):
+        return all(
+            isinstance(k, str) and _reads_back_from_json(v) for k, v in value.items()
+        )
+    return True
+
+
+def _free_suffixed_path(stem: str, extension: str) -> str:
+    """Return ``{stem}_{random hex}{extension}`` for a name not yet taken.
+
+    A random suffix usually needs a single existence check, however many
+    files already share the stem; counting up from _1 needs one per file.
+    """
+    while True:
+        candidate = f"{stem}_{secrets.token_hex(3)}{extension}"
+        if not os.path.lexists(candidate):
+            return candidate
+
+
+def format_frontmatter(frontmatter: Dict[str, Any]) -> str:
+    """Serialise frontmatter as YAML, one ``key: <JSON value>`` line per field.
+
+    JSON is valid YAML flow syntax, so this loads back to the same data as
+    yaml.dump output without going through PyYAML's emitter. Values that
+    don't survive the trip fall back to yaml.dump.
+    """
+    try:
+        if all(_reads_back_from_json(v) for v in frontmatter.values()):
+            text = "".join(
+                [
+                    f"{key}: {json.dumps(value, ensure_ascii=False)}\n"
+                    for key, value in frontmatter.items()
+                ]
+            )
+            if not _YAML_UNSAFE_RE.search(text):
+                return text
+    except TypeError:
+        pass
+    return yaml.dump(frontmatter, default_flow_style=False, sort_keys=False)
+
+
+def media_timestamp() -> str:
+    """Local-time ``YYYYmmdd_HHMMSS_mmm`` stamp used to name media files."""
+    now_ns = time.time_ns()
+    t = time.localtime(now_ns // 1_000_000_000)
+    return "%04d%02d%02d_%02d%02d%02d_%03d" % (
+        t.tm_year,
+        t.tm_mon,
+        t.tm_mday,
+        t.tm_hour,
+        t.tm_min,
+        t.tm_sec,
+        now_ns // 1_000_000 % 1000,
+    )
+
+
+class _DirSyncer:
+    """Group-commits fsyncs of one directory.
+
+    A caller that finds a sync already running waits for the next one and
+    is covered by it, so a burst of N writes costs about two directory
+    fsyncs rather than N.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.supported = True
+        self._cond = threading.Condition()
+        self._requested = 0
+        self._synced = 0
+        self._syncing = False
+
+    def sync(self) -> None:
+        with self._cond:
+            self._requested += 1
+            ticket = self._requested
+            while self._synced < ticket:
+                if self._syncing:
+                    self._cond.wait()
+                    continue
+                self._syncing = True
+                covered = self._requested
+                self._cond.release()
+                try:
+                    self._fsync_dir()
+                finally:
+                    self._cond.acquire()
+                    self._syncing = False
+                    self._cond.notify_all()
+                self._synced = max(self._synced, covered)
+
+    def _fsync_dir(self) -> None:
+        if not self.supported:
+            return
+        fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            os.fsync(fd)
+        except OSError as e:
+            # Some network filesystems refuse directory fsync; fall back to
+            # file-level durability rather than failing every capture
+            if e.errno not in (errno.EINVAL, errno.ENOTSUP, errno.EOPNOTSUPP):
+                raise
+            self.supported = False
+        finally:
+            os.close(fd)
+
 
 class SafeMarkdownWriter:
     """Handles safe writing of capture data to markdown files."""
 
-    def __init__(self, vault_path: str):
+    def __init__(self, vault_path: str, durability: str = "none"):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(
+                f"durability must be one of {', '.join(DURABILITY_LEVELS)}, "
+                f"got {durability!r}"
+            )
+        self.durability = durability
         self.vault_path = Path(vault_path).expanduser()
         self.capture_dir = self.vault_path / "capture" / "raw_capture"
         self.media_dir = self.vault_path / "capture" / "raw_capture" / "media"
 
+        self._capture_dir_str = str(self.capture_dir)
+
         self.capture_dir.mkdir(parents=True, exist_ok=True)
         self.media_dir.mkdir(parents=True, exist_ok=True)
 
+        self._dir_syncer = _DirSyncer(self.capture_dir)
+        # Fed by write_capture_async; the writer thread starts on first use
+        self._write_queue: "queue.Queue[Tuple[Dict[str, Any], Future]]" = queue.Queue()
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_start_lock = threading.Lock()
+
     def write_capture(self, capture_data: Dict[str, Any]) -> Path:
         """Write capture data to individual idea markdown file safely."""
-        idea_file = self.get_idea_file(
-            capture_data.get("timestamp"), capture_data.get("capture_id")
-        )
+        return self.atomic_write(*self._prepare_capture(capture_data))
+
+    def write_capture_async(self, capture_data: Dict[str, Any]) -> "Future[Path]":
+        """Queue a capture for the writer thread and return a Future of its path.
+
+        The thread writes whatever has queued up as one batch, so with
+        durability "dir" a burst of captures shares a single directory fsync.
+        A Future only resolves once its capture is as durable as
+        write_capture would have made it.
+        """
+        fut: "Future[Path]" = Future()
+        self._write_queue.put((capture_data, fut))
+        if self._writer_thread is None:
+            with self._writer_start_lock:
+                if self._writer_thread is None:
+                    thread = threading.Thread(
+                        target=self._drain_writes, name="capture-writer", daemon=True
+                    )
+                    thread.start()
+                    self._writer_thread = thread
+        return fut
 
-        if idea_file.exists():
-            idea_file = self.get_unique_idea_file(
-                capture_data.get("timestamp"), capture_data.get("capture_id")
-            )
+    def _drain_writes(self) -> None:
+        while True:
+            batch = [self._write_queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            written = []
+            for capture_data, fut in batch:
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                try:
+                    path = self._place_file(*self._prepare_capture(capture_data))
+                    written.append((fut, path))
+                except Exception as e:
+                    fut.set_exception(e)
+
+            if written and self.durability == "dir":
+                try:
+                    self._dir_syncer.sync()
+                except Exception as e:
+                    for fut, _ in written:
+                        fut.set_exception(e)
+                    continue
+            for fut, path in written:
+                fut.set_result(path)
+
+    def _prepare_capture(self, capture_data: Dict[str, Any]) -> Tuple[Path, str]:
+        """Pick the file name for a capture and render its markdown."""
+        timestamp = capture_data.get("timestamp")
+        capture_id = capture_data.get("capture_id")
+        if timestamp is None or not capture_id:
+            # Resolve defaults once so the file name and the frontmatter id agree
+            if timestamp is None:
+                timestamp = datetime.now(timezone.utc).replace(microsecond=0)
+            capture_id = self.generate_capture_id(timestamp, capture_id)
+            capture_data = {
+                **capture_data,
+                "timestamp": timestamp,
+                "capture_id": capture_id,
+            }
 
-        formatted_content = self.format_capture(capture_data)
+        idea_file = self.get_idea_file(timestamp, capture_id)
+        if os.path.lexists(idea_file):
+            idea_file = self.get_unique_idea_file(timestamp, capture_id)
 
-        return self.atomic_write(idea_file, formatted_content)
+        return idea_file, self.format_capture(capture_data)
 
     def get_idea_file(
         self,
@@ -50,8 +271,7 @@ class SafeMarkdownWriter:
         if capture_id is None:
             capture_id = self.generate_capture_id(timestamp)
 
-        filename = f"{capture_id}.md"
-        return self.capture_dir / filename
+        return Path(os.path.join(self._capture_dir_str, f"{capture_id}.md"))
 
     def get_unique_idea_file(
         self,
@@ -65,28 +285,49 @@ class SafeMarkdownWriter:
         if capture_id is None:
             capture_id = self.generate_capture_id(timestamp)
 
-        counter = 1
-        while True:
-            filename = f"{capture_id}_{counter}.md"
-            idea_file = self.capture_dir / filename
-            if not idea_file.exists():
-                return idea_file
-            counter += 1
+        base = os.path.join(self._capture_dir_str, capture_id)
+        return Path(_free_suffixed_path(base, ".md"))
 
     def atomic_write(self, target_file: Path, content: str) -> Path:
         """Perform atomic write operation for new file creation."""
-        temp_file = target_file.with_suffix(".tmp")
+        self._place_file(target_file, content)
+        if self.durability == "dir" and target_file.parent == self.capture_dir:
+            self._dir_syncer.sync()
+        return target_file
 
-        try:
-            with temp_file.open("w", encoding="utf-8") as f:
-                f.write(content)
+    def _place_file(self, target_file: Path, content: str) -> Path:
+        """Write content to a temp file and rename it over target_file.
 
-            temp_file.replace(target_file)
-            return target_file
+        Leaves the directory fsync to the caller, which may cover several
+        files with one.
+        """
+        temp_file = target_file.with_suffix(".tmp")
+        data = content.encode("utf-8")
 
+        try:
+            self._write_bytes(temp_file, data, sync=self.durability != "none")
+            os.replace(temp_file, target_file)
         except Exception as e:
             temp_file.unlink(missing_ok=True)
             raise Exception(f"Failed to write capture: {e}")
+        return target_file
+
+    @staticmethod
+    def _write_bytes(path: Path, data: bytes, sync: bool = False) -> None:
+        """Write data to a new file straight through os-level calls.
+
+        Skips the buffered/text I/O layers; a capture is small enough that
+        this is one open, one write and one close.
+        """
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o666)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view) :]
+            if sync:
+                _fdatasync(fd)
+        finally:
+            os.close(fd)
 
     def format_capture(self, capture_data: Dict[str, Any]) -> str:
         """Format capture data as markdown with YAML frontmatter."""
@@ -102,6 +343,8 @@ class SafeMarkdownWriter:
         # Use the provided capture_id or generate a new one
         provided_id = capture_data.get("capture_id")
         capture_id = self.generate_capture_id(timestamp_for_id, provided_id)
+        # The ISO timestamp already starts with YYYY-MM-DD
+        date_str = iso_ts[:10]
 
         context_data = capture_data.get("context", {})
         if isinstance(context_data, str):
@@ -150,25 +393,22 @@ class SafeMarkdownWriter:
             "location": capture_data.get("location"),
             "metadata": capture_data.get("metadata", {}),
             "processing_status": "raw",
-            "created_date": capture_data.get(
-                "created_date", timestamp_for_id.date().isoformat()
-            ),
-            "last_edited_date": capture_data.get(
-                "last_edited_date", timestamp_for_id.date().isoformat()
-            ),
+            "created_date": capture_data.get("created_date", date_str),
+            "last_edited_date": capture_data.get("last_edited_date", date_str),
         }
 
-        content_sections = []
+        # Frontmatter and sections go into one list that is joined once
+        parts = ["---\n", format_frontmatter(frontmatter), "---\n"]
 
         if str(capture_data.get("content", "")).strip():
-            content_sections.append(f"## Content\n{capture_data.get('content')}\n")
+            parts.append(f"## Content\n{capture_data.get('content')}\n")
 
         clip = str(capture_data.get("clipboard", "") or "")
         if clip.strip():
             if clip.startswith("```") or "\n" in clip:
-                content_sections.append(f"## Clipboard\n{clip}\n")
+                parts.append(f"## Clipboard\n{clip}\n")
             else:
-                content_sections.append(f"## Clipboard\n```\n{clip}\n```\n")
+                parts.append(f"## Clipboard\n```\n{clip}\n```\n")
 
         media_files = capture_data.get("media_files", [])
         if media_files:
@@ -177,24 +417,18 @@ class SafeMarkdownWriter:
                 media_path = media_file.get("path", "")
 
                 if media_type == "screenshot":
-                    content_sections.append(
-                        f"## Screenshot\n![Screenshot]({media_path})\n"
-                    )
+                    parts.append(f"## Screenshot\n![Screenshot]({media_path})\n")
                 elif media_type == "audio":
                     relative_path = self.get_relative_media_path(media_path)
-                    content_sections.append(
-                        f"## Audio\n[Audio Recording]({relative_path})\n"
-                    )
+                    parts.append(f"## Audio\n[Audio Recording]({relative_path})\n")
                 elif media_type == "image":
                     relative_path = self.get_relative_media_path(media_path)
-                    content_sections.append(f"## Image\n![Image]({relative_path})\n")
+                    parts.append(f"## Image\n![Image]({relative_path})\n")
                 else:
                     relative_path = self.get_relative_media_path(media_path)
-                    content_sections.append(f"## File\n[Attachment]({relative_path})\n")
+                    parts.append(f"## File\n[Attachment]({relative_path})\n")
 
-        yaml_content = yaml.dump(frontmatter, default_flow_style=False, sort_keys=False)
-        formatted_content = f"---\n{yaml_content}---\n{''.join(content_sections)}"
-        return formatted_content
+        return "".join(parts)
 
     def generate_capture_id(self, timestamp: datetime, provided_id: str = None) -> str:
         """Generate a unique capture ID based on timestamp or use provided ID."""
@@ -212,9 +446,25 @@ class SafeMarkdownWriter:
             return str(media_path)
 
     def list_ideas(self) -> List[Path]:
-        """List all existing idea files sorted by modification time."""
-        idea_files = list(self.capture_dir.glob("*.md"))
-        return sorted(idea_files, key=lambda f: f.stat().st_mtime, reverse=True)
+        """List all existing idea files sorted by modification time.
+
+        Not cached: editing a note in place changes its mtime, and so the
+        order, without touching the directory's mtime.
+        """
+        entries = []
+        with os.scandir(self._capture_dir_str) as it:
+            for entry in it:
+                # Same selection as glob("*.md"): no dotfiles
+                name = entry.name
+                if not name.endswith(".md") or name.startswith("."):
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                entries.append((mtime, entry.path))
+        entries.sort(reverse=True)
+        return [Path(path) for _, path in entries]
 
     def read_idea_file(self, idea_file: Path) -> Optional[Dict[str, Any]]:
         """Read and parse an existing idea file."""
@@ -223,10 +473,12 @@ class SafeMarkdownWriter:
                 content = f.read()
 
             if content.startswith("---"):
-                parts = content.split("---", 2)
-                if len(parts) >= 3:
-                    frontmatter = yaml.safe_load(parts[1])
-                    body = parts[2].strip()
+                # Locate the closing delimiter line directly rather than
+                # splitting on every "---" in the file
+                end = content.find("\n---", 3)
+                if end != -1:
+                    frontmatter = yaml.load(content[3:end], Loader=_YamlLoader)
+                    body = content[end + 4 :].strip()
 
                     return {
                         "frontmatter": frontmatter,
@@ -239,7 +491,7 @@ class SafeMarkdownWriter:
 
     def save_media_file(self, source_path: Path, media_type: str) -> Path:
         """Save media file to media directory with unique name."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        timestamp = media_timestamp()
 
         if source_path.suffix:
             extension = source_path.suffix
@@ -252,14 +504,10 @@ class SafeMarkdownWriter:
             }
             extension = extension_map.get(media_type, ".bin")
 
-        target_filename = f"{timestamp}_{media_type}{extension}"
-        target_path = self.media_dir / target_filename
-
-        counter = 1
-        while target_path.exists():
-            target_filename = f"{timestamp}_{media_type}_{counter}{extension}"
-            target_path = self.media_dir / target_filename
-            counter += 1
+        stem = os.path.join(str(self.media_dir), f"{timestamp}_{media_type}")
+        target_path = Path(stem + extension)
+        if os.path.lexists(target_path):
+            target_path = Path(_free_suffixed_path(stem, extension))
 
         try:
             shutil.copy2(source_path, target_path)
@@ -1,9 +1,12 @@
 import os
+import shutil
 import sys
-import argparse
 import asyncio
 import subprocess
+import threading
 import yaml
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any, Set
@@ -20,28 +23,33 @@ try:
 except ImportError:
     print("⚠️ Alias suggestions module not available - using basic fallback")
     ALIAS_SUGGESTIONS_AVAILABLE = False
-from hypercorn.config import Config
-from hypercorn.asyncio import serve
 
-sys.path.append(str(Path(__file__).resolve().parent.parent))
-from geolocation import get_device_location
+# Repository root; relative config, vault and database paths resolve against it
+_ROOT_DIR = Path(__file__).resolve().parent.parent
+_DEFAULT_CONFIG_PATH = _ROOT_DIR / "config.yaml"
 
-# Try to import audio recorder, but make it optional
-try:
-    from audio_recorder import AudioRecordingManager
-    AUDIO_RECORDING_AVAILABLE = True
-except (ImportError, OSError) as e:
-    print(f"⚠️  Audio recording disabled: {e}")
-    AUDIO_RECORDING_AVAILABLE = False
-    AudioRecordingManager = None
+sys.path.append(str(_ROOT_DIR))
+from geolocation import get_device_location
 
 import hashlib
 import json
 import re
 import http.client
 
+# orjson parses Ollama responses several times faster, but stays optional
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# libyaml's C loader is much faster than the pure-Python SafeLoader
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 from main_db import MainDatabase
-from markdown_writer import SafeMarkdownWriter
+from markdown_writer import SafeMarkdownWriter, media_timestamp
 
 app = FastAPI()
 app.add_middleware(
@@ -52,18 +60,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-web_dist_path = Path(__file__).resolve().parent.parent / "web" / "dist"
+web_dist_path = _ROOT_DIR / "web" / "dist"
 if not web_dist_path.exists():
     web_dist_path = Path(__file__).resolve().parent / "web" / "dist"
 
 main_db = None
+# One SafeMarkdownWriter per (vault path, durability), see get_writer
+_writers: Dict[tuple, SafeMarkdownWriter] = {}
 # Global variables to track AI-suggested tags/sources
 _ai_suggested_tags = set()
 _ai_suggested_sources = set()
 
 _config_path = None
-audio_manager = AudioRecordingManager() if AUDIO_RECORDING_AVAILABLE else None
-_ai_cache = {}
+# Parsed config files by path, with the (mtime_ns, size) they were parsed at
+_config_cache: Dict[str, tuple] = {}
+# Audio recording is optional and pulls in numpy/sounddevice, so it is
+# imported on first use rather than at server startup (see get_audio_manager)
+AUDIO_RECORDING_AVAILABLE = None
+_audio_manager = None
+_audio_manager_lock = threading.Lock()
+# Recent AI suggestion results, least recently used first (see _ai_cache_get)
+AI_CACHE_SIZE = 1024
+_ai_cache: "OrderedDict[str, list]" = OrderedDict()
+_ai_cache_lock = threading.Lock()
+# Bounded pool for blocking capture I/O, reused across requests
+_capture_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="capture")
 
 
 def get_main_db():
@@ -75,18 +96,57 @@ def get_main_db():
     return main_db
 
 
+def get_writer(vault_path: str, durability: str = "none") -> SafeMarkdownWriter:
+    """Get the markdown writer for a vault, kept warm across requests."""
+    key = (vault_path, durability)
+    writer = _writers.get(key)
+    if writer is None:
+        writer = _writers[key] = SafeMarkdownWriter(vault_path, durability=durability)
+    return writer
+
+
+def get_audio_manager():
+    """Get the audio recording manager, or None if audio is unavailable."""
+    global AUDIO_RECORDING_AVAILABLE, _audio_manager
+    if AUDIO_RECORDING_AVAILABLE is None:
+        # Audio endpoints run on the threadpool; only one of them may build
+        # the manager, or recorders started on a discarded one are lost
+        with _audio_manager_lock:
+            if AUDIO_RECORDING_AVAILABLE is None:
+                try:
+                    from audio_recorder import AudioRecordingManager
+
+                    _audio_manager = AudioRecordingManager()
+                    AUDIO_RECORDING_AVAILABLE = True
+                except (ImportError, OSError) as e:
+                    print(f"⚠️  Audio recording disabled: {e}")
+                    AUDIO_RECORDING_AVAILABLE = False
+    return _audio_manager
+
+
 def load_config(config_path=None):
     if config_path:
         cfg_path = Path(config_path)
         if not cfg_path.is_absolute():
-            cfg_path = Path(__file__).resolve().parent.parent / config_path
+            cfg_path = _ROOT_DIR / config_path
     else:
-        cfg_path = Path(__file__).resolve().parent.parent / "config.yaml"
+        cfg_path = _DEFAULT_CONFIG_PATH
 
-    if not cfg_path.exists():
+    try:
+        st = cfg_path.stat()
+    except FileNotFoundError:
         return {}
-    with cfg_path.open("r") as f:
-        return yaml.safe_load(f) or {}
+
+    # Re-parse only when the file changed; callers must treat the result as read-only
+    key = str(cfg_path)
+    signature = (st.st_mtime_ns, st.st_size)
+    cached = _config_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    cfg = yaml.load(cfg_path.read_text(), Loader=_YamlLoader) or {}
+    _config_cache[key] = (signature, cfg)
+    return cfg
 
 
 def normalize_config(cfg):
@@ -99,11 +159,9 @@ def normalize_config(cfg):
 
     vault_path = vault_config.get("path", "~/notes")
     if vault_path == "ROOT_DIRECTORY_PATH":
-        root_path = str(Path(__file__).resolve().parent.parent)
-        vault_path = root_path
+        vault_path = str(_ROOT_DIR)
     elif vault_path == "ROOT_DIRECTORY_PATH/dev":
-        root_path = str(Path(__file__).resolve().parent.parent)
-        vault_path = root_path + "/dev"
+        vault_path = str(_ROOT_DIR) + "/dev"
 
     db_path = database_config.get("path", "server/main.db")
 
@@ -121,7 +179,7 @@ def normalize_config(cfg):
             data_dir.mkdir(parents=True, exist_ok=True)
             db_path = str(data_dir / "main.db")
         else:
-            db_path = str(Path(__file__).resolve().parent.parent / db_path)
+            db_path = str(_ROOT_DIR / db_path)
 
     if "KMS_VAULT_PATH" in os.environ:
         vault_path = os.environ["KMS_VAULT_PATH"]
@@ -146,11 +204,13 @@ def normalize_config(cfg):
     return d
 
 
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_json_decoder = json.JSONDecoder()
+
+
 def _kebab_case(s: str) -> str:
-    s = s.strip().lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    s = re.sub(r"-+", "-", s)
-    return s.strip("-")
+    # Runs of non-alphanumerics collapse to a single dash in one pass
+    return _NON_ALNUM_RE.sub("-", s.strip().lower()).strip("-")
 
 
 def _singularize(s: str) -> str:
@@ -160,78 +220,169 @@ def _singularize(s: str) -> str:
     return t
 
 
-def _sha_content(s: str) -> str:
-    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+def _hash_content(s: str) -> str:
+    # The hash goes back to the client and into suggestion_feedback, so it
+    # must be stable across processes; blake2b is just a cheaper digest.
+    return hashlib.blake2b(s.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _ai_cache_get(key: str) -> Optional[list]:
+    with _ai_cache_lock:
+        items = _ai_cache.get(key)
+        if items is not None:
+            _ai_cache.move_to_end(key)
+        return items
+
+
+def _ai_cache_put(key: str, items: list) -> None:
+    with _ai_cache_lock:
+        _ai_cache[key] = items
+        _ai_cache.move_to_end(key)
+        while len(_ai_cache) > AI_CACHE_SIZE:
+            _ai_cache.popitem(last=False)
+
+
+# Records read past the parsed JSON (normally just the final "done" one) so the
+# keep-alive connection is left clean for the next request
+OLLAMA_DRAIN_RECORDS = 8
+
+
+def _read_ollama_stream(res) -> Optional[dict]:
+    # Ollama streams one JSON object per line, each carrying a fragment of the
+    # generated text. The answer is taken as soon as the fragments form a
+    # complete JSON document; the short tail after it is only drained, and
+    # abandoned if the model keeps generating.
+    parts: List[str] = []
+    result = None
+    trailing = 0
+    for line in res:
+        if not line.strip():
+            continue
+        chunk = _json_loads(line)
+        frag = chunk.get("response") or ""
+        if result is not None:
+            trailing += 1
+            if frag.strip() or trailing > OLLAMA_DRAIN_RECORDS:
+                return result
+            continue
+        if frag:
+            parts.append(frag)
+            if "}" in frag:
+                try:
+                    result = _json_loads("".join(parts))
+                except Exception:
+                    pass
+    if result is not None:
+        return result
+    return _find_items_object("".join(parts))
+
+
+def _find_items_object(txt: str) -> Optional[dict]:
+    # Models sometimes wrap the JSON in prose. raw_decode stops at the end of
+    # the first complete value, so trailing text is never parsed.
+    i = txt.find("{")
+    while i != -1:
+        try:
+            obj, _ = _json_decoder.raw_decode(txt, i)
+        except ValueError:
+            pass
+        else:
+            if isinstance(obj, dict) and "items" in obj:
+                return obj
+        i = txt.find("{", i + 1)
+    return None
+
+
+_ollama_local = threading.local()
+
+
+def _ollama_connection(host: str, port: int) -> http.client.HTTPConnection:
+    # One keep-alive connection per worker thread, so repeated suggestions
+    # skip the TCP handshake; replaced if the configured endpoint changes
+    conn = getattr(_ollama_local, "conn", None)
+    if conn is None or (conn.host, conn.port) != (host, port):
+        if conn is not None:
+            conn.close()
+        conn = http.client.HTTPConnection(host, port=port, timeout=30)
+        _ollama_local.conn = conn
+    return conn
 
 
 def _ollama_chat(
     host: str, port: int, model: str, temperature: float, prompt: str
 ) -> Optional[dict]:
+    conn = None
     try:
         parsed_host = host.replace("http://", "").replace("https://", "")
         if ":" in parsed_host:
             parsed_host = parsed_host.split(":")[0]
-        conn = http.client.HTTPConnection(parsed_host, port=port, timeout=30)
+        conn = _ollama_connection(parsed_host, port)
         payload = json.dumps(
             {
                 "model": model,
                 "prompt": prompt,
-                "stream": False,
+                "stream": True,
                 "format": "json",
                 "options": {"temperature": temperature},
             }
         )
         headers = {"Content-Type": "application/json"}
-        conn.request("POST", "/api/generate", payload, headers)
-        res = conn.getresponse()
-        data = res.read()
-        conn.close()
-        raw = data.decode("utf-8")
-        j = json.loads(raw)
-        if "response" in j:
-            txt = j.get("response") or ""
-            try:
-                return json.loads(txt)
-            except Exception:
-                m = re.search(
-                    r"\\{\\s*\\\"items\\\"\\s*:\\s*\\[.*?\\]\\s*\\}",
-                    txt,
-                    flags=re.DOTALL,
-                )
-                if m:
-                    try:
-                        return json.loads(m.group(0))
-                    except Exception:
-                        return None
-        return None
+        try:
+            conn.request("POST", "/api/generate", payload, headers)
+            res = conn.getresponse()
+        except (http.client.HTTPException, ConnectionError):
+            # Ollama closed the idle keep-alive socket; retry on a fresh one
+            conn.close()
+            conn.request("POST", "/api/generate", payload, headers)
+            res = conn.getresponse()
+        result = _read_ollama_stream(res)
+        if not res.isclosed():
+            # We stopped before the end of the stream, so the socket is
+            # mid-response and can't be reused
+            conn.close()
+        return result
     except Exception:
+        if conn is not None:
+            conn.close()
         return None
 
 
+# The alias endpoint asks for a caller-chosen number of aliases, so its
+# instructions are split around that count
+_ALIAS_PROMPT_HEAD = "Based on the following note content, generate "
+_ALIAS_PROMPT_TAIL = (
+    " meaningful and concise aliases or titles. "
+    "These aliases should capture the main topic or essence of the note. "
+    "Output JSON with array 'items', each item "
+    '{"value": string, "confidence": number between 0 and 1}. '
+    "Make sure aliases are clear, descriptive, and under 50 characters. "
+    "Content:\n"
+)
+
+
+# Instruction text per suggestion field; the note content is appended after it
+_PROMPT_PREFIXES = {
+    "tag": (
+        "Given the user's note content, extract 3-10 tags. The tags should be concepts and should be related to what the note is about. It should not be random items in the note. "
+        'Do not include duplicates. Output JSON with array \'items\', each item {"value": string, "confidence": number between 0 and 1}. '
+        'If there are any entities mentioned in the note, suggest tags for them. For example, if the note mentions "Never Eat Alone", suggest "never-eat-alone". The output should always be in kebab-case.'
+        "Content:\n"
+    ),
+    "source": (
+        "From the user's note content, infer sources. If content say 'James told me', suggest 'james'; always kebab-case the person/entity. "
+        "If content is reflection by the user referencing a book like 'Never Eat Alone', include both 'me' (as the user is generating the reflection) and 'never-eat-alone'. "
+        'Normalize all sources to kebab-case. Output JSON with array \'items\', each item {"value": string, "confidence": number between 0 and 1}. '
+        "Content:\n"
+    ),
+    "alias": _ALIAS_PROMPT_HEAD + "3-5" + _ALIAS_PROMPT_TAIL,
+}
+
+
 def _build_prompt(field_type: str, content: str, cfg: dict) -> str:
-    if field_type == "tag":
-        return (
-            "Given the user's note content, extract 3-10 tags. The tags should be concepts and should be related to what the note is about. It should not be random items in the note. "
-            'Do not include duplicates. Output JSON with array \'items\', each item {"value": string, "confidence": number between 0 and 1}. '
-            'If there are any entities mentioned in the note, suggest tags for them. For example, if the note mentions "Never Eat Alone", suggest "never-eat-alone". The output should always be in kebab-case.'
-            "Content:\n" + content
-        )
-    if field_type == "source":
-        return (
-            "From the user's note content, infer sources. If content say 'James told me', suggest 'james'; always kebab-case the person/entity. "
-            "If content is reflection by the user referencing a book like 'Never Eat Alone', include both 'me' (as the user is generating the reflection) and 'never-eat-alone'. "
-            'Normalize all sources to kebab-case. Output JSON with array \'items\', each item {"value": string, "confidence": number between 0 and 1}. '
-            "Content:\n" + content
-        )
-    if field_type == "alias":
-        return (
-            "Based on the following note content, generate 3-5 meaningful and concise aliases or titles. "
-            "These aliases should capture the main topic or essence of the note. "
-            'Output JSON with array \'items\', each item {"value": string, "confidence": number between 0 and 1}. '
-            "Make sure aliases are clear, descriptive, and under 50 characters. "
-            "Content:\n" + content
-        )
-    return ""
+    prefix = _PROMPT_PREFIXES.get(field_type)
+    if prefix is None:
+        return ""
+    return prefix + content
 
 
 @app.get("/api/config")
@@ -273,64 +424,85 @@ def api_clipboard():
 def api_screenshot():
     """Trigger grim screenshot capture."""
     try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        timestamp = media_timestamp()
         cfg = normalize_config(load_config(_config_path))
         media_dir = Path(cfg["vault"]["path"]).expanduser() / cfg["vault"]["media_dir"]
         media_dir.mkdir(parents=True, exist_ok=True)
         screenshot_path = media_dir / f"{timestamp}_screenshot.png"
 
-        # grimblast --notify  --freeze save area - > {screenshot path}
-        import os
+        # grimblast --notify --freeze save area - > {screenshot path}, minus the shell
+        with open(screenshot_path, "wb") as out:
+            result = subprocess.run(
+                ["grimblast", "--notify", "--freeze", "save", "area", "-"],
+                stdout=out,
+            )
 
-        result = os.system(
-            f"grimblast --notify --freeze save area - > {screenshot_path}"
-        )
-        # result = subprocess.run(
-        #     [
-        #         "grimblast",
-        #         "--notify",
-        #         "--freeze",
-        #         "save",
-        #         "-",
-        #         ">",
-        #         str(screenshot_path),
-        #     ],
-        #     capture_output=True,
-        #     timeout=50,
-        # )
-
-        if result == 0:
+        if result.returncode == 0:
             return {"path": str(screenshot_path), "success": True}
         return {"success": False, "error": "Screenshot failed"}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
+_SUGGESTION_FIELD_TYPES = frozenset({"tag", "source", "context"})
+_AI_SUGGESTION_FIELD_TYPES = frozenset({"tag", "source", "alias"})
+
+
+def _error_response(message: str, status_code: int) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status_code)
+
+
+def _invalid_field_type() -> JSONResponse:
+    return _error_response("Invalid field type", 400)
+
+
+def _audio_unavailable() -> JSONResponse:
+    return _error_response("Audio recording is not available", 503)
+
+
+def _has_text_content(capture_data):
+    return bool(capture_data.get("content", "").strip())
+
+
+def _has_media_files(capture_data):
+    return bool(capture_data.get("media_files"))
+
+
+# Content check per modality; modalities not listed here (e.g. clipboard) need none
+_MODALITY_CONTENT_CHECKS = {
+    "text": _has_text_content,
+    "screenshot": _has_media_files,
+    "audio": _has_media_files,
+    "system-audio": _has_media_files,
+}
+
+
 def _validate_modalities_have_content(capture_data, modalities):
     """Validate that selected modalities have actual content."""
     if not modalities:
         return False
 
     for modality in modalities:
-        if modality == "text":
-            content = capture_data.get("content", "").strip()
-            if not content:
-                return False
-        elif modality == "clipboard":
-            pass
-        elif modality == "screenshot":
-            if not capture_data.get("media_files"):
-                return False
-        elif modality == "audio":
-            if not capture_data.get("media_files"):
-                return False
-        elif modality == "system-audio":
-            if not capture_data.get("media_files"):
-                return False
+        check = _MODALITY_CONTENT_CHECKS.get(modality)
+        if check is not None and not check(capture_data):
+            return False
 
     return True
 
 
+async def _run_capture_io(fn, *args):
+    """Run blocking capture work (disk, DB, geolocation) on the capture pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_capture_executor, fn, *args)
+
+
+def _save_upload(src, dest: Path):
+    """Stream an uploaded file to disk without holding it all in memory."""
+    src.seek(0)
+    with dest.open("wb") as out:
+        shutil.copyfileobj(src, out, 1024 * 1024)
+
+
 @app.post("/api/capture")
 async def api_capture(
     content: str = Form(""),
@@ -348,7 +520,10 @@ async def api_capture(
     media: Optional[List[UploadFile]] = File(None),
 ):
     cfg = normalize_config(load_config(_config_path))
-    writer = SafeMarkdownWriter(str(Path(cfg["vault"]["path"]).expanduser()))
+    writer = get_writer(
+        str(Path(cfg["vault"]["path"]).expanduser()),
+        (cfg["capture"] or {}).get("durability", "none"),
+    )
     ts = datetime.now(timezone.utc)
     cds = created_date or ts.date().isoformat()
     les = last_edited_date or ts.date().isoformat()
@@ -375,13 +550,13 @@ async def api_capture(
         for f in media:
             name = f.filename or f"upload_{datetime.now().timestamp()}"
             dest = media_dir / name
-            b = await f.read()
-            dest.write_bytes(b)
+            await _run_capture_io(_save_upload, f.file, dest)
             files_meta.append({"path": str(dest), "name": name})
 
     if screenshot_path and screenshot_type:
         files_meta.append({"path": screenshot_path, "type": screenshot_type})
-    location_data = get_device_location()
+    # Blocking network/disk work runs in a worker thread so the event loop stays free
+    location_data = await _run_capture_io(get_device_location)
 
     # Use provided capture_id if available, otherwise generate a new one using timestamp
     actual_capture_id = capture_id.strip() if capture_id.strip() else ts.isoformat()
@@ -409,13 +584,12 @@ async def api_capture(
     }
 
     if not _validate_modalities_have_content(capture, mod_list):
-        return JSONResponse(
-            {"error": "No content provided for selected modalities"}, status_code=400
-        )
+        return _error_response("No content provided for selected modalities", 400)
 
-    p = writer.write_capture(capture)
+    # Queued to the writer's own thread, which batches concurrent captures
+    p = await asyncio.wrap_future(writer.write_capture_async(capture))
 
-    get_main_db().store_capture_data(capture)
+    await _run_capture_io(get_main_db().store_capture_data, capture)
 
     import os
 
@@ -433,7 +607,8 @@ async def api_capture(
         ]
 
         # Store both sets separately
-        get_main_db().store_last_used_values(
+        await _run_capture_io(
+            get_main_db().store_last_used_values,
             {"tags": user_tags, "sources": user_sources},
             {
                 "tags": [
@@ -449,13 +624,13 @@ async def api_capture(
         return {"saved_to": str(p), "verified": file_exists}
     except Exception as e:
         # Return a properly formatted JSON error response
-        return JSONResponse({"error": f"Save failed: {str(e)}"}, status_code=500)
+        return _error_response(f"Save failed: {str(e)}", 500)
 
 
 @app.get("/api/suggestions/{field_type}")
 def api_suggestions(field_type: str, query: str = "", limit: int = 10):
-    if field_type not in ["tag", "source", "context"]:
-        return JSONResponse({"error": "Invalid field type"}, status_code=400)
+    if field_type not in _SUGGESTION_FIELD_TYPES:
+        return _invalid_field_type()
     suggestions = get_main_db().get_suggestions(field_type, query, limit)
     return {
         "suggestions": [
@@ -473,8 +648,8 @@ def api_suggestions(field_type: str, query: str = "", limit: int = 10):
 @app.get("/api/suggestion-exists/{field_type}")
 def api_suggestion_exists(field_type: str, value: str):
     """Check if a suggestion value exists in the database."""
-    if field_type not in ["tag", "source", "context"]:
-        return JSONResponse({"error": "Invalid field type"}, status_code=400)
+    if field_type not in _SUGGESTION_FIELD_TYPES:
+        return _invalid_field_type()
 
     exists = get_main_db().suggestion_exists(value, field_type)
     return {"exists": exists}
@@ -489,8 +664,8 @@ async def api_ai_suggestions_feedback(
     edited_value: Optional[str] = Form(None),
     content_hash: Optional[str] = Form(None),
 ):
-    if field_type not in ["tag", "source", "context"]:
-        return JSONResponse({"error": "Invalid field type"}, status_code=400)
+    if field_type not in _SUGGESTION_FIELD_TYPES:
+        return _invalid_field_type()
     get_main_db().store_suggestion_feedback(
         field_type, value, action, confidence, edited_value, content_hash
     )
@@ -507,16 +682,17 @@ def api_recent_values():
 @app.post("/api/audio/start")
 def api_audio_start(recorder_type: str = Form(...), recorder_id: str = Form(...)):
     """Start audio recording."""
-    if not AUDIO_RECORDING_AVAILABLE or not audio_manager:
-        return JSONResponse({"error": "Audio recording is not available"}, status_code=503)
+    audio_manager = get_audio_manager()
+    if audio_manager is None:
+        return _audio_unavailable()
     
     if not audio_manager.create_recorder(recorder_type, recorder_id):
         if recorder_id in audio_manager.recorders:
-            return JSONResponse({"error": "Recorder already exists"}, status_code=400)
-        return JSONResponse({"error": "Invalid recorder type"}, status_code=400)
+            return _error_response("Recorder already exists", 400)
+        return _error_response("Invalid recorder type", 400)
 
     if not audio_manager.start_recording(recorder_id):
-        return JSONResponse({"error": "Failed to start recording"}, status_code=500)
+        return _error_response("Failed to start recording", 500)
 
     return {"status": "recording_started", "recorder_id": recorder_id}
 
@@ -524,13 +700,14 @@ def api_audio_start(recorder_type: str = Form(...), recorder_id: str = Form(...)
 @app.post("/api/audio/stop")
 def api_audio_stop(recorder_id: str = Form(...)):
     """Stop audio recording and save file."""
-    if not AUDIO_RECORDING_AVAILABLE or not audio_manager:
-        return JSONResponse({"error": "Audio recording is not available"}, status_code=503)
+    audio_manager = get_audio_manager()
+    if audio_manager is None:
+        return _audio_unavailable()
     
     if not audio_manager.stop_recording(recorder_id):
-        return JSONResponse({"error": "Failed to stop recording"}, status_code=500)
+        return _error_response("Failed to stop recording", 500)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+    timestamp = media_timestamp()
     filename = f"audio_{recorder_id}_{timestamp}.wav"
     cfg = normalize_config(load_config(_config_path))
     filepath = (
@@ -539,7 +716,7 @@ def api_audio_stop(recorder_id: str = Form(...)):
     filepath.parent.mkdir(parents=True, exist_ok=True)
 
     if not audio_manager.save_recording(recorder_id, filepath):
-        return JSONResponse({"error": "Failed to save recording"}, status_code=500)
+        return _error_response("Failed to save recording", 500)
 
     audio_manager.cleanup_recorder(recorder_id)
 
@@ -553,35 +730,34 @@ def api_audio_stop(recorder_id: str = Form(...)):
 @app.get("/api/ai-suggestions/{field_type}")
 def api_ai_suggestions(field_type: str, content: str = "", limit: int = 10):
     print(f"Getting AI suggestions for {field_type} with content length {len(content)}")
-    if field_type not in ["tag", "source", "alias"]:
-        return JSONResponse({"error": "Invalid field type"}, status_code=400)
+    if field_type not in _AI_SUGGESTION_FIELD_TYPES:
+        return _invalid_field_type()
     
     # Special handling for alias suggestions
     if field_type == "alias":
         content_norm = (content or "").strip()
         if not content_norm:
             return {"ai": [], "content_hash": None}
-        h = _sha_content(content_norm)
+        # Not cached: the UI offers one alias at a time, so asking again for
+        # the same content must be able to produce a different one
+        h = _hash_content(content_norm)
         
         # First try to use the Ollama LLM directly
         cfg = normalize_config(load_config(_config_path))
-        ai_mode = (cfg.get("ai") or {}).get("mode") or "local"
-        ai_cfg = (cfg.get("ai") or {}).get("ollama") or {}
+        ai_section = cfg.get("ai") or {}
+        ai_mode = ai_section.get("mode") or "local"
+        ai_cfg = ai_section.get("ollama") or {}
         
         # Get Ollama server config
         host = ai_cfg.get("host") or "http://127.0.0.1"
         port = int(ai_cfg.get("port") or 11434)
         model = ai_cfg.get("model") or "llama3.2:3b"
-        temperature = float((cfg.get("ai") or {}).get("ollama", {}).get("temperature", 0.2) or 0.2)
+        temperature = float(ai_cfg.get("temperature", 0.2) or 0.2)
         
         # Build specialized prompt for aliases
         prompt = (
-            "Based on the following note content, generate {limit} meaningful and concise aliases or titles. "
-            "These aliases should capture the main topic or essence of the note. "
-            "Output JSON with array 'items', each item {{\"value\": string, \"confidence\": number between 0 and 1}}. "
-            "Make sure aliases are clear, descriptive, and under 50 characters. "
-            "Content:\n{content}"
-        ).format(limit=limit, content=content_norm[:1000] if len(content_norm) > 1000 else content_norm)
+            _ALIAS_PROMPT_HEAD + str(limit) + _ALIAS_PROMPT_TAIL + content_norm[:1000]
+        )
         
         try:
             # Try to use Ollama directly
@@ -604,22 +780,17 @@ def api_ai_suggestions(field_type: str, content: str = "", limit: int = 10):
     content_norm = (content or "").strip()
     if not content_norm:
         return {"ai": [], "content_hash": None}
-    h = _sha_content(content_norm)
+    h = _hash_content(content_norm)
     k = f"{field_type}:{h}"
-    ai_mode = (cfg.get("ai") or {}).get("mode") or "local"
-    ai_cfg = (cfg.get("ai") or {}).get("ollama") or {}
-    temperature = float(
-        (cfg.get("ai") or {}).get("ollama", {}).get("temperature", 0) or 0
-    )
-    suggest_existing_only = bool(
-        (cfg.get("ai") or {}).get("behavior", {}).get("suggest_existing_only", False)
-    )
-    include_db_boost = bool(
-        (cfg.get("ai") or {}).get("behavior", {}).get("include_db_priority_boost", True)
-    )
-    if k in _ai_cache:
-        ai_items = _ai_cache[k]
-    else:
+    ai_section = cfg.get("ai") or {}
+    ai_mode = ai_section.get("mode") or "local"
+    ai_cfg = ai_section.get("ollama") or {}
+    behavior = ai_section.get("behavior") or {}
+    temperature = float(ai_cfg.get("temperature", 0) or 0)
+    suggest_existing_only = bool(behavior.get("suggest_existing_only", False))
+    include_db_boost = bool(behavior.get("include_db_priority_boost", True))
+    ai_items = _ai_cache_get(k)
+    if ai_items is None:
         prompt = _build_prompt(field_type, content_norm, cfg)
         ai_resp = None
         if ai_mode in ["local", "hybrid"]:
@@ -629,30 +800,35 @@ def api_ai_suggestions(field_type: str, content: str = "", limit: int = 10):
             ai_resp = _ollama_chat(host, port, model, temperature, prompt)
         items = []
         if isinstance(ai_resp, dict) and isinstance(ai_resp.get("items"), list):
-            for it in ai_resp["items"]:
-                v = str(it.get("value", "")).strip()
-                if not v:
-                    continue
-                c = float(it.get("confidence", 0.5))
-                if field_type == "tag" and (cfg.get("ai") or {}).get(
-                    "normalization", {}
-                ).get("tags_kebab", True):
-                    v = _kebab_case(v)
-                if field_type == "source" and (cfg.get("ai") or {}).get(
-                    "normalization", {}
-                ).get("sources_kebab", True):
-                    v = _kebab_case(v)
-                items.append({"value": v, "confidence": c})
-        _ai_cache[k] = items
+            normalization = ai_section.get("normalization") or {}
+            if field_type == "tag":
+                kebab = normalization.get("tags_kebab", True)
+            else:
+                kebab = normalization.get("sources_kebab", True)
+            pairs = [
+                (str(it.get("value", "")).strip(), it.get("confidence", 0.5))
+                for it in ai_resp["items"]
+            ]
+            items = [
+                {"value": _kebab_case(v) if kebab else v, "confidence": float(c)}
+                for v, c in pairs
+                if v
+            ]
+            # Only real answers are cached; an unreachable model is retried
+            _ai_cache_put(k, items)
         ai_items = items
     if suggest_existing_only:
         base = get_main_db().get_suggestions(field_type, "", 500)
         db_set = set([s.value for s in base])
         ai_items = [x for x in ai_items if x["value"] in db_set]
     if include_db_boost:
+        # One query for all suggested values instead of one connection per item
+        known = get_main_db().existing_values(
+            [x["value"] for x in ai_items], field_type
+        )
         boosted = []
         for x in ai_items:
-            b = 0.2 if get_main_db().suggestion_exists(x["value"], field_type) else 0.0
+            b = 0.2 if x["value"] in known else 0.0
             boosted.append(
                 {
                     "value": x["value"],
@@ -684,6 +860,9 @@ def api_ai_suggestions(field_type: str, content: str = "", limit: int = 10):
 @app.get("/api/audio/status/{recorder_id}")
 def api_audio_status(recorder_id: str):
     """Get audio recording status."""
+    audio_manager = get_audio_manager()
+    if audio_manager is None:
+        return _audio_unavailable()
     status = audio_manager.get_recording_status(recorder_id)
     return status
 
@@ -693,7 +872,11 @@ async def websocket_audio_waveform(websocket: WebSocket, recorder_id: str):
     """WebSocket endpoint for real-time waveform data."""
     await websocket.accept()
     
-    if not AUDIO_RECORDING_AVAILABLE or not audio_manager:
+    if AUDIO_RECORDING_AVAILABLE is None:
+        # The first use imports numpy/sounddevice; keep that off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, get_audio_manager)
+    audio_manager = get_audio_manager()
+    if audio_manager is None:
         await websocket.send_json({"error": "Audio recording is not available"})
         await websocket.close()
         return
@@ -714,10 +897,10 @@ def serve_media_file(filename: str):
     media_path = Path(cfg["vault"]["path"]).expanduser() / cfg["vault"]["media_dir"] / filename
     
     if not media_path.exists():
-        return JSONResponse({"error": "File not found"}, status_code=404)
+        return _error_response("File not found", 404)
     
     if not media_path.is_file():
-        return JSONResponse({"error": "Not a file"}, status_code=400)
+        return _error_response("Not a file", 400)
     
     # Serve the file
     return FileResponse(media_path)
@@ -748,6 +931,11 @@ def api_ai_health():
 if web_dist_path.exists():
     app.mount("/", StaticFiles(directory=str(web_dist_path), html=True), name="static")
 if __name__ == "__main__":
+    # Only needed when run as a script, not when imported (e.g. by tests)
+    import argparse
+    from hypercorn.config import Config
+    from hypercorn.asyncio import serve
+
     parser = argparse.ArgumentParser(description="Knowledge Management System Server")
     parser.add_argument("--config", type=str, help="Path to config file")
     args = parser.parse_args()
@@ -2,7 +2,7 @@ import sqlite3
 import json
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
 from dataclasses import dataclass
 import difflib
 
@@ -326,6 +326,25 @@ class MainDatabase:
             count = cursor.fetchone()[0]
             return count > 0
 
+    def existing_values(self, values: List[str], field_type: str) -> Set[str]:
+        """Return the subset of values that exist in the database."""
+        table_map = {"tag": "tags", "source": "sources", "context": "contexts"}
+
+        if field_type not in table_map or not values:
+            return set()
+
+        table = table_map[field_type]
+        placeholders = ", ".join("?" for _ in values)
+
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT DISTINCT value FROM {table} WHERE value IN ({placeholders})
+            """,
+                list(values),
+            )
+            return {row[0] for row in cursor.fetchall()}
+
     def _ensure_last_used_table_exists(self):
         """Ensure the last_used_values table exists."""
         with sqlite3.connect(self.db_path) as conn:
@@ -0,0 +1,32 @@
+import sys
+from collections import OrderedDict
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "server"))
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(app, "_ai_cache", OrderedDict())
+    monkeypatch.setattr(app, "AI_CACHE_SIZE", 3)
+
+
+class TestAICache:
+    def test_miss_returns_none(self):
+        assert app._ai_cache_get("tag:missing") is None
+
+    def test_evicts_least_recently_used(self):
+        for key in ("a", "b", "c"):
+            app._ai_cache_put(key, [key])
+        assert app._ai_cache_get("a") == ["a"]
+        app._ai_cache_put("d", ["d"])
+        assert app._ai_cache_get("b") is None
+        assert [app._ai_cache_get(k) for k in ("a", "c", "d")] == [["a"], ["c"], ["d"]]
+
+    def test_empty_result_is_a_hit(self):
+        app._ai_cache_put("tag:x", [])
+        assert app._ai_cache_get("tag:x") == []
@@ -0,0 +1,43 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "server"))
+
+import app
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("vault:\n  path: /tmp/one\n")
+    return path
+
+
+class TestLoadConfig:
+    def test_missing_file(self, tmp_path):
+        assert app.load_config(str(tmp_path / "missing.yaml")) == {}
+
+    def test_parses_once_while_unchanged(self, config_file, monkeypatch):
+        calls = []
+        real_load = app.yaml.load
+
+        def counting_load(stream, Loader):
+            calls.append(1)
+            return real_load(stream, Loader=Loader)
+
+        monkeypatch.setattr(app.yaml, "load", counting_load)
+        first = app.load_config(str(config_file))
+        second = app.load_config(str(config_file))
+        assert first == {"vault": {"path": "/tmp/one"}}
+        assert second is first
+        assert len(calls) == 1
+
+    def test_reloads_after_change(self, config_file):
+        assert app.load_config(str(config_file))["vault"]["path"] == "/tmp/one"
+        config_file.write_text("vault:\n  path: /tmp/two\n")
+        st = config_file.stat()
+        os.utime(config_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert app.load_config(str(config_file))["vault"]["path"] == "/tmp/two"
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import geolocation
+
+LOCATION = {
+    "latitude": 1.0,
+    "longitude": 2.0,
+    "city": "Champaign",
+    "country": "United States",
+    "timezone": "America/Chicago",
+}
+
+
+class FakeLookup:
+    def __init__(self):
+        self.calls = 0
+        self.now = 1000.0
+        self.result = LOCATION
+
+    def fetch(self):
+        self.calls += 1
+        return self.result
+
+
+@pytest.fixture
+def lookup(monkeypatch):
+    """Stub out the network lookup and the clock."""
+    fake = FakeLookup()
+    monkeypatch.setattr(geolocation, "_cached_location", None)
+    monkeypatch.setattr(geolocation, "_fetch_location", fake.fetch)
+    monkeypatch.setattr(geolocation.time, "monotonic", lambda: fake.now)
+    return fake
+
+
+class TestGetDeviceLocation:
+    def test_reuses_recent_lookup(self, lookup):
+        assert geolocation.get_device_location() == LOCATION
+        lookup.now += geolocation.LOCATION_TTL_S - 1
+        assert geolocation.get_device_location() == LOCATION
+        assert lookup.calls == 1
+
+    def test_refreshes_after_ttl(self, lookup):
+        geolocation.get_device_location()
+        lookup.now += geolocation.LOCATION_TTL_S
+        geolocation.get_device_location()
+        assert lookup.calls == 2
+
+    def test_retries_failures_sooner(self, lookup):
+        lookup.result = None
+        assert geolocation.get_device_location() is None
+        assert geolocation.get_device_location() is None
+        assert lookup.calls == 1
+        lookup.result = LOCATION
+        lookup.now += geolocation.LOCATION_FAILURE_TTL_S
+        assert geolocation.get_device_location() == LOCATION
+        assert lookup.calls == 2
+
+    def test_callers_get_their_own_copy(self, lookup):
+        geolocation.get_device_location()["city"] = "changed"
+        assert geolocation.get_device_location()["city"] == "Champaign"
@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "server"))
+
+from main_db import MainDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = MainDatabase(str(tmp_path / "main.db"))
+    db.store_capture_data(
+        {"capture_id": "c1", "tags": ["python", "ml"], "sources": ["james"]}
+    )
+    db.store_capture_data({"capture_id": "c2", "tags": ["python"]})
+    return db
+
+
+class TestExistingValues:
+    def test_known_and_unknown_values(self, db):
+        found = db.existing_values(["python", "rust", "ml", "james"], "tag")
+        assert found == {"python", "ml"}
+
+    def test_matches_suggestion_exists(self, db):
+        values = ["python", "rust", "ml", "james"]
+        for field_type in ("tag", "source"):
+            expected = {v for v in values if db.suggestion_exists(v, field_type)}
+            assert db.existing_values(values, field_type) == expected
+
+    def test_empty_values(self, db):
+        assert db.existing_values([], "tag") == set()
+
+    def test_unknown_field_type(self, db):
+        assert db.existing_values(["python"], "alias") == set()
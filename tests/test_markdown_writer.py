@@ -0,0 +1,264 @@
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import markdown_writer
+from markdown_writer import SafeMarkdownWriter, format_frontmatter, media_timestamp
+
+
+@pytest.fixture
+def writer(tmp_path):
+    return SafeMarkdownWriter(str(tmp_path))
+
+
+def _make_ideas(writer, count):
+    paths = []
+    for i in range(count):
+        path = writer.capture_dir / f"idea_{i}.md"
+        path.write_text(f"idea {i}")
+        os.utime(path, (1_000_000 + i, 1_000_000 + i))
+        paths.append(path)
+    return paths
+
+
+class TestListIdeas:
+    def test_newest_first(self, writer):
+        paths = _make_ideas(writer, 5)
+        assert writer.list_ideas() == list(reversed(paths))
+
+    def test_ignores_non_markdown(self, writer):
+        _make_ideas(writer, 2)
+        (writer.capture_dir / "notes.txt").write_text("x")
+        assert all(p.suffix == ".md" for p in writer.list_ideas())
+
+    def test_ignores_hidden_files(self, writer):
+        paths = _make_ideas(writer, 2)
+        (writer.capture_dir / ".draft.md").write_text("x")
+        assert sorted(writer.list_ideas()) == sorted(paths)
+
+
+class TestMediaTimestamp:
+    def test_format(self):
+        stamp = media_timestamp()
+        assert re.fullmatch(r"\d{8}_\d{6}_\d{3}", stamp)
+
+    def test_matches_strftime(self):
+        before = datetime.now().replace(microsecond=0)
+        stamp = media_timestamp()
+        after = datetime.now()
+        parsed = datetime.strptime(stamp, "%Y%m%d_%H%M%S_%f")
+        assert before <= parsed <= after
+
+
+class TestReadIdeaFile:
+    def test_round_trip(self, writer):
+        path = writer.write_capture(
+            {
+                "timestamp": datetime(2025, 1, 2, 3, 4, 5),
+                "capture_id": "note-1",
+                "content": "first line\n---\nafter a rule",
+                "tags": ["a", "b"],
+                "context": "a---b",
+            }
+        )
+        idea = writer.read_idea_file(path)
+        assert idea["frontmatter"]["id"] == "note-1"
+        assert idea["frontmatter"]["tags"] == ["a", "b"]
+        assert idea["frontmatter"]["context"] == ["a---b"]
+        assert idea["body"] == "## Content\nfirst line\n---\nafter a rule"
+
+    def test_without_frontmatter(self, writer):
+        path = writer.capture_dir / "plain.md"
+        path.write_text("just text")
+        assert writer.read_idea_file(path) is None
+
+    def test_non_ascii_round_trip(self, writer):
+        path = writer.write_capture({"content": "café → 日本語", "capture_id": "utf8"})
+        assert "café → 日本語" in path.read_text(encoding="utf-8")
+        assert not path.with_suffix(".tmp").exists()
+
+    def test_reparses_after_change(self, writer):
+        path = writer.write_capture({"content": "old", "capture_id": "changing"})
+        assert "old" in writer.read_idea_file(path)["body"]
+        path.write_text(path.read_text().replace("old", "newer"))
+        assert "newer" in writer.read_idea_file(path)["body"]
+
+
+class TestFormatFrontmatter:
+    def test_round_trips_capture_fields(self):
+        frontmatter = {
+            "timestamp": "2025-01-02T03:04:05+00:00",
+            "aliases": ["note: one", "- two", "'quoted'", 'say "hi"', "yes", "null"],
+            "context": ["café → 日本語 😀", "multi\nline\ttabbed"],
+            "location": {"latitude": 40.1, "longitude": -88.2, "city": None},
+            "metadata": {},
+            "created_date": "2025-01-02",
+        }
+        text = format_frontmatter(frontmatter)
+        assert text.startswith('timestamp: "2025-01-02T03:04:05+00:00"\n')
+        assert yaml.safe_load(text) == frontmatter
+
+    @pytest.mark.parametrize(
+        "value",
+        [1e-05, float("inf"), {1: "int key"}, datetime(2025, 1, 2), "next\x85line"],
+    )
+    def test_falls_back_to_yaml_dump(self, value):
+        text = format_frontmatter({"value": value})
+        assert text == yaml.dump({"value": value}, default_flow_style=False, sort_keys=False)
+
+
+class TestIdeaFileNames:
+    def test_collisions_get_random_suffix(self, writer):
+        first = writer.write_capture({"content": "a", "capture_id": "same"})
+        second = writer.write_capture({"content": "b", "capture_id": "same"})
+        third = writer.write_capture({"content": "c", "capture_id": "same"})
+        assert first.name == "same.md"
+        for path in (second, third):
+            assert re.fullmatch(r"same_[0-9a-f]{6}\.md", path.name)
+        assert len({first, second, third}) == 3
+
+    def test_generated_id_matches_file_name(self, writer):
+        path = writer.write_capture({"content": "no id or timestamp"})
+        frontmatter = writer.read_idea_file(path)["frontmatter"]
+        assert path.stem == frontmatter["id"] == frontmatter["capture_id"]
+        assert frontmatter["created_date"] == frontmatter["timestamp"][:10]
+
+    def test_media_collisions_get_suffixed(self, writer, tmp_path, monkeypatch):
+        monkeypatch.setattr(
+            markdown_writer, "media_timestamp", lambda: "20250102_030405_006"
+        )
+        source = tmp_path / "shot.png"
+        source.write_bytes(b"png")
+        first = writer.save_media_file(source, "screenshot")
+        second = writer.save_media_file(source, "screenshot")
+        assert first.name == "20250102_030405_006_screenshot.png"
+        assert re.fullmatch(r"20250102_030405_006_screenshot_[0-9a-f]{6}\.png", second.name)
+        assert second.read_bytes() == b"png"
+
+
+class TestListIdeasFreshness:
+    def test_sees_external_file(self, writer):
+        _make_ideas(writer, 2)
+        writer.list_ideas()
+        new = writer.capture_dir / "external.md"
+        new.write_text("x")
+        assert writer.list_ideas()[0] == new
+
+    def test_sees_own_write(self, writer):
+        _make_ideas(writer, 2)
+        writer.list_ideas()
+        path = writer.write_capture({"content": "new", "capture_id": "mine"})
+        assert writer.list_ideas()[0] == path
+
+    def test_in_place_edit_moves_idea_first(self, writer):
+        paths = _make_ideas(writer, 3)
+        dir_mtime = writer.capture_dir.stat().st_mtime_ns
+        assert writer.list_ideas() == list(reversed(paths))
+        with paths[0].open("a") as f:
+            f.write("edited")
+        os.utime(paths[0], (2_000_000, 2_000_000))
+        # An edit in place leaves the directory itself untouched
+        assert writer.capture_dir.stat().st_mtime_ns == dir_mtime
+        assert writer.list_ideas() == [paths[0], paths[2], paths[1]]
+
+
+class TestVaultDirectories:
+    def test_recreated_after_vault_removed(self, tmp_path):
+        SafeMarkdownWriter(str(tmp_path / "vault"))
+        shutil.rmtree(tmp_path / "vault")
+        writer = SafeMarkdownWriter(str(tmp_path / "vault"))
+        assert writer.media_dir.is_dir()
+        assert writer.write_capture({"content": "x", "capture_id": "a"}).exists()
+
+
+class TestDurability:
+    def test_rejects_unknown_level(self, tmp_path):
+        with pytest.raises(ValueError):
+            SafeMarkdownWriter(str(tmp_path), durability="always")
+
+    def test_concurrent_dir_syncs_are_coalesced(self, tmp_path, monkeypatch):
+        writer = SafeMarkdownWriter(str(tmp_path), durability="dir")
+        syncs = []
+        real_fsync = os.fsync
+
+        def slow_fsync(fd):
+            syncs.append(fd)
+            time.sleep(0.01)
+            real_fsync(fd)
+
+        monkeypatch.setattr(os, "fsync", slow_fsync)
+        threads = [
+            threading.Thread(
+                target=writer.write_capture,
+                args=({"content": "x", "capture_id": f"burst-{i}"},),
+            )
+            for i in range(20)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(writer.list_ideas()) == 20
+        assert 1 <= len(syncs) < 20
+
+
+class TestWriteCaptureAsync:
+    def test_resolves_to_written_file(self, writer):
+        fut = writer.write_capture_async({"content": "queued", "capture_id": "q-1"})
+        path = fut.result(timeout=5)
+        assert path == writer.capture_dir / "q-1.md"
+        assert "queued" in writer.read_idea_file(path)["body"]
+
+    def test_colliding_ids_in_one_batch(self, writer):
+        futures = [
+            writer.write_capture_async({"content": str(i), "capture_id": "same"})
+            for i in range(5)
+        ]
+        paths = [f.result(timeout=5) for f in futures]
+        assert len(set(paths)) == 5
+        assert all(p.exists() for p in paths)
+
+    def test_batch_shares_dir_sync(self, tmp_path, monkeypatch):
+        writer = SafeMarkdownWriter(str(tmp_path), durability="dir")
+        syncs = []
+        monkeypatch.setattr(writer._dir_syncer, "_fsync_dir", lambda: syncs.append(1))
+        # Stall the first capture so the rest queue up behind it
+        gate = threading.Event()
+        format_capture = writer.format_capture
+
+        def gated_format(capture_data):
+            gate.wait(5)
+            return format_capture(capture_data)
+
+        monkeypatch.setattr(writer, "format_capture", gated_format)
+        futures = [
+            writer.write_capture_async({"content": "x", "capture_id": f"b-{i}"})
+            for i in range(20)
+        ]
+        time.sleep(0.05)
+        gate.set()
+        for f in futures:
+            f.result(timeout=5)
+
+        assert len(writer.list_ideas()) == 20
+        assert len(syncs) <= 2
+
+    def test_failure_is_reported_on_future(self, writer, monkeypatch):
+        def boom(path, data, sync=False):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(writer, "_write_bytes", boom)
+        fut = writer.write_capture_async({"content": "x", "capture_id": "f-1"})
+        with pytest.raises(Exception, match="disk full"):
+            fut.result(timeout=5)
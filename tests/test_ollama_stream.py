@@ -0,0 +1,47 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "server"))
+
+import app
+
+
+def _stream(text, tail=()):
+    """NDJSON lines as Ollama sends them: text in small fragments, then done."""
+    records = [
+        {"response": text[i : i + 5], "done": False} for i in range(0, len(text), 5)
+    ]
+    records += [{"response": r, "done": False} for r in tail]
+    records.append({"response": "", "done": True})
+    return [json.dumps(r).encode() + b"\n" for r in records]
+
+
+class FakeResponse:
+    def __init__(self, lines):
+        self.lines = lines
+        self.read = 0
+
+    def __iter__(self):
+        for line in self.lines:
+            self.read += 1
+            yield line
+
+
+ITEMS = json.dumps({"items": [{"value": "a", "confidence": 0.5}]})
+
+
+class TestReadOllamaStream:
+    def test_drains_to_done_after_parse(self):
+        res = FakeResponse(_stream(ITEMS))
+        assert app._read_ollama_stream(res) == json.loads(ITEMS)
+        assert res.read == len(res.lines)
+
+    def test_abandons_runaway_generation(self):
+        res = FakeResponse(_stream(ITEMS, tail=[" "] * 50))
+        assert app._read_ollama_stream(res) == json.loads(ITEMS)
+        assert res.read < len(res.lines)
+
+    def test_prose_wrapped_json(self):
+        res = FakeResponse(_stream("Sure! " + ITEMS + " Hope that helps."))
+        assert app._read_ollama_stream(res) == json.loads(ITEMS)
@@ -1,6 +1,6 @@
-import React, { useEffect, useState } from 'react'
+import React, { useCallback, useEffect, useRef, useState } from 'react'
 import CaptureForm from './components/CaptureForm'
-import ModalityBar from './components/ModalityBar'
+import ModalityBar, { MODALITIES } from './components/ModalityBar'
 import ClipboardPreview from './components/ClipboardPreview'
 import AudioRecorder from './components/AudioRecorder'
 import HelpOverlay from './components/HelpOverlay'
@@ -14,6 +14,28 @@ type Config = {
   is_dev?: boolean
 }
 
+const AI_HEALTH_POLL_MS = 1000
+const AI_HEALTH_MAX_POLL_MS = 30000
+
+type KeyHandlers = {
+  toggleHelp: () => void
+  handleSave: () => void
+  resetForm: () => void
+  toggleModalityByIndex: (i: number) => void
+}
+type KeyAction = (h: KeyHandlers) => void
+
+// Global shortcuts, looked up by KeyboardEvent.key; Ctrl combinations are
+// tried first and fall back to the plain key (so Ctrl+F1 still opens help)
+const KEY_ACTIONS = new Map<string, KeyAction>([
+  ['F1', h => h.toggleHelp()],
+  ['Escape', h => h.resetForm()],
+])
+const CTRL_KEY_ACTIONS = new Map<string, KeyAction>([
+  ['Enter', h => h.handleSave()],
+  ...[1, 2, 3, 4, 5, 6, 7, 8, 9].map((n): [string, KeyAction] => [String(n), h => h.toggleModalityByIndex(n - 1)]),
+])
+
 const App: React.FC = () => {
   const [config, setConfig] = useState<Config | null>(null)
   const [content, setContent] = useState('')
@@ -77,35 +99,12 @@ const App: React.FC = () => {
     }).catch(() => setConfig({ vault: { path: '', capture_dir: '', media_dir: '' } }))
   }, [])
 
-  useEffect(() => {
-    const onKeyDown = (e: KeyboardEvent) => {
-      if (e.key === 'F1') { e.preventDefault(); setHelp(x => !x) }
-      if (e.key === 'Enter' && e.ctrlKey) { 
-        e.preventDefault(); 
-        handleSave()
-      }
-      if (e.key === 'Escape') { 
-        e.preventDefault(); 
-        resetForm()
-      }
-      if (e.ctrlKey && /^[1-9]$/.test(e.key)) {
-        e.preventDefault()
-        const idx = parseInt(e.key, 10) - 1
-        toggleModalityByIndex(idx)
-      }
-    }
-    window.addEventListener('keydown', onKeyDown)
-    return () => {
-      window.removeEventListener('keydown', onKeyDown)
-    }
-  }, [modalities, content, context, tags, sources])
-
-  const toggleModality = (m: string) => {
+  // Stable callbacks so the memoized ModalityBar skips re-rendering on every keystroke
+  const toggleModality = useCallback((m: string) => {
     setModalities(prev => prev.includes(m) ? prev.filter(x => x !== m) : [...prev, m])
-  }
+  }, [])
   const toggleModalityByIndex = (i: number) => {
-    const all = ['text','clipboard','screenshot','audio','system-audio']
-    if (i >= 0 && i < all.length) toggleModality(all[i])
+    if (i >= 0 && i < MODALITIES.length) toggleModality(MODALITIES[i])
   }
   const resetForm = () => {
     setContent('')
@@ -130,19 +129,19 @@ const App: React.FC = () => {
     setMediaFiles(Array.from(files))
     if (!modalities.includes('files')) setModalities([...modalities, 'files'])
   }
-  const onScreenshot = async () => {
+  const onScreenshot = useCallback(async () => {
     try {
       const response = await fetch('/api/screenshot', { method: 'POST' })
       const data = await response.json()
       if (data.success && data.path) {
         const screenshotMeta = { path: data.path, type: 'screenshot', name: `screenshot_${Date.now()}.png` }
         setMediaFiles(prev => [...prev, screenshotMeta as any])
-        if (!modalities.includes('screenshot')) setModalities([...modalities, 'screenshot'])
+        setModalities(prev => prev.includes('screenshot') ? prev : [...prev, 'screenshot'])
       }
     } catch (error) {
       console.error('Screenshot failed:', error)
     }
-  }
+  }, [])
 
   const onAudioReady = (file: File) => {
     setMediaFiles(prev => [...prev, file])
@@ -153,7 +152,12 @@ const App: React.FC = () => {
     setMediaFiles(prev => [...prev, file])
     if (!modalities.includes('system-audio')) setModalities([...modalities, 'system-audio'])
   }
+  // Ctrl+Enter auto-repeats; a ref (unlike the saving state) is visible to
+  // the very next keydown, so a held key can't start a second save
+  const saveInFlight = useRef(false)
   const handleSave = async () => {
+    if (saveInFlight.current) return
+    saveInFlight.current = true
     console.log('DEBUG: onSave called with content:', content)
     console.log('DEBUG: onSave called with context:', context)
     console.log('DEBUG: onSave called with tags:', tags)
@@ -213,10 +217,30 @@ const App: React.FC = () => {
       console.error('Save failed:', error)
       setPopup({ type: 'error', message: `Save failed: ${error instanceof Error ? error.message : 'Unknown error'}` })
     } finally {
+      saveInFlight.current = false
       setSaving(false)
     }
   }
 
+  // The keydown listener is attached once and reads the latest handlers from
+  // this ref, instead of being re-registered on every keystroke
+  const toggleHelp = () => setHelp(x => !x)
+  const keyHandlers = useRef<KeyHandlers>({ toggleHelp, handleSave, resetForm, toggleModalityByIndex })
+  keyHandlers.current = { toggleHelp, handleSave, resetForm, toggleModalityByIndex }
+
+  useEffect(() => {
+    const onKeyDown = (e: KeyboardEvent) => {
+      const action = (e.ctrlKey && CTRL_KEY_ACTIONS.get(e.key)) || KEY_ACTIONS.get(e.key)
+      if (!action) return
+      e.preventDefault()
+      action(keyHandlers.current)
+    }
+    window.addEventListener('keydown', onKeyDown)
+    return () => {
+      window.removeEventListener('keydown', onKeyDown)
+    }
+  }, [])
+
   const pollMs = config?.ui?.clipboard_poll_ms || 200
 
   useEffect(() => {
@@ -226,18 +250,42 @@ const App: React.FC = () => {
   }, [popup])
 
   useEffect(() => {
+    let mounted = true
+    let t: any
+    let busy = false
+    let delay = AI_HEALTH_POLL_MS
     const aiHealthCheck = async () => {
       try {
-        // Use the retry mechanism for AI health check
-        const j = await fetchWithRetry('/api/ai/health')
-        setAiConnected(j.status === 'ok' ? 'ok' : 'err')
+        const r = await fetch('/api/ai/health')
+        const j = await r.json()
+        const ok = j.connected === true
+        if (mounted) setAiConnected(ok ? 'ok' : 'err')
+        // Back off while the AI server is down instead of probing it every second
+        delay = ok ? AI_HEALTH_POLL_MS : Math.min(delay * 2, AI_HEALTH_MAX_POLL_MS)
       } catch {
-        setAiConnected('err')
+        if (mounted) setAiConnected('err')
+        delay = Math.min(delay * 2, AI_HEALTH_MAX_POLL_MS)
       }
     }
-    aiHealthCheck()
-    const t = window.setInterval(aiHealthCheck, 1000)
-    return () => { if (t) window.clearInterval(t) }
+    // One check at a time, and none while the window is hidden
+    const loop = () => {
+      if (document.hidden) { t = setTimeout(loop, delay); return }
+      busy = true
+      aiHealthCheck().finally(() => { busy = false; if (mounted) t = setTimeout(loop, delay) })
+    }
+    const onVisible = () => {
+      if (document.hidden || busy) return
+      if (t) clearTimeout(t)
+      delay = AI_HEALTH_POLL_MS
+      loop()
+    }
+    loop()
+    document.addEventListener('visibilitychange', onVisible)
+    return () => {
+      mounted = false
+      if (t) clearTimeout(t)
+      document.removeEventListener('visibilitychange', onVisible)
+    }
   }, [])
 
   return (
@@ -1,10 +1,39 @@
-import React, { useState, useEffect, useRef } from 'react'
+import React, { useState, useEffect, useMemo, useRef } from 'react'
 import EntityChips from './EntityChips'
 import SuggestionDropdown from './SuggestionDropdown'
 import PublicToggle from './PublicToggle'
 
 type AISuggestion = { value: string; confidence?: number }
 
+const CONTEXT_CHECK_DEBOUNCE_MS = 150
+
+// Static layout styles, built once instead of on every render
+const styles: Record<string, React.CSSProperties> = {
+  noteIdRow: { marginBottom: '10px', display: 'flex', alignItems: 'center' },
+  grow: { flex: 1 },
+  noteIdLabel: { fontSize: '12px', color: '#666' },
+  noteIdValue: { fontFamily: 'monospace', padding: '0 5px', fontSize: '14px' },
+  copyButton: {
+    background: 'none',
+    border: '1px solid #ccc',
+    borderRadius: '4px',
+    padding: '2px 8px',
+    cursor: 'pointer',
+    fontSize: '12px'
+  },
+  aliasRow: { marginTop: '15px', display: 'flex', alignItems: 'center' },
+  aliasInput: { flex: 1, padding: '8px', borderRadius: '4px', border: '1px solid #ccc' },
+  suggestButton: {
+    marginLeft: '10px',
+    background: '#f0f0f0',
+    border: '1px solid #ccc',
+    borderRadius: '4px',
+    padding: '8px 12px',
+    cursor: 'pointer',
+    fontSize: '12px'
+  }
+}
+
 type Props = {
   content: string
   setContent: (v: string) => void
@@ -31,26 +60,22 @@ const CaptureForm: React.FC<Props> = (p) => {
   const [generatingSources, setGeneratingSources] = useState(false)
   const [dev, setDev] = useState(false)
   const [aiReady, setAiReady] = useState(false)
-  const [isPublic, setIsPublic] = useState(false)
   const aiConfigRef = useRef<{ on_blur: boolean; interval_ms: number; dev_regen: boolean } | null>(null)
   const lastContentHash = useRef<string>('')
+  const contextCheckTimer = useRef<number | undefined>(undefined)
 
   useEffect(() => {
     loadPersistentValues()
+    return () => window.clearTimeout(contextCheckTimer.current)
   }, [])
 
-  // Initialize public toggle based on existing tags
-  useEffect(() => {
-    const tagList = p.tags.split(',').map(t => t.trim()).filter(t => t)
-    setIsPublic(tagList.includes('public'))
-  }, [p.tags])
+  // Split the tags once per change; the public toggle is derived from them
+  // rather than mirrored into state by an effect (which cost a second render)
+  const tagList = useMemo(() => p.tags.split(',').map(t => t.trim()).filter(t => t), [p.tags])
+  const isPublic = tagList.includes('public')
 
   // Handle public toggle changes
   const handlePublicToggle = (newIsPublic: boolean) => {
-    setIsPublic(newIsPublic)
-    
-    const tagList = p.tags.split(',').map(t => t.trim()).filter(t => t)
-    
     if (newIsPublic) {
       // Add public tag if not already present
       if (!tagList.includes('public')) {
@@ -171,8 +196,10 @@ const CaptureForm: React.FC<Props> = (p) => {
     const newValue = e.target.value
     p.setContext(newValue)
     
+    // Coalesce a burst of keystrokes into a single existence check
+    window.clearTimeout(contextCheckTimer.current)
     if (newValue.trim()) {
-      checkContextExists(newValue.trim())
+      contextCheckTimer.current = window.setTimeout(() => checkContextExists(newValue.trim()), CONTEXT_CHECK_DEBOUNCE_MS)
     } else {
       setContextColor('')
     }
@@ -192,39 +219,25 @@ const CaptureForm: React.FC<Props> = (p) => {
     }
   }
 
-  const onAcceptAI = async (field: 'tag' | 'source', value: string, confidence?: number) => {
-    try {
-      const fd = new FormData()
-      fd.append('field_type', field)
-      fd.append('value', value)
-      fd.append('action', 'accepted')
-      // Still send confidence to the server, but don't display it in UI
-      if (typeof confidence === 'number') fd.append('confidence', String(confidence))
-      fd.append('content_hash', lastContentHash.current)
-      await fetch('/api/ai-suggestions/feedback', { method: 'POST', body: fd })
-    } catch {}
-    
-    // Remove the accepted suggestion from the suggestions list
-    if (field === 'tag') {
-      setAiTagSuggestions(prev => prev.filter(x => x.value !== value))
-    } else {
-      setAiSourceSuggestions(prev => prev.filter(x => x.value !== value))
-    }
-  }
-
-  const onDeclineAI = async (field: 'tag' | 'source', value: string, confidence?: number) => {
-    try {
-      const fd = new FormData()
-      fd.append('field_type', field)
-      fd.append('value', value)
-      fd.append('action', 'declined')
-      if (typeof confidence === 'number') fd.append('confidence', String(confidence))
-      fd.append('content_hash', lastContentHash.current)
-      await fetch('/api/ai-suggestions/feedback', { method: 'POST', body: fd })
-    } catch {}
+  // Accept and decline only differ in the recorded action. The suggestion is
+  // removed right away; the feedback POST doesn't need to hold up the UI
+  const sendAIFeedback = (action: 'accepted' | 'declined', field: 'tag' | 'source', value: string, confidence?: number) => {
     if (field === 'tag') setAiTagSuggestions(prev => prev.filter(x => x.value !== value))
     else setAiSourceSuggestions(prev => prev.filter(x => x.value !== value))
+
+    const fd = new FormData()
+    fd.append('field_type', field)
+    fd.append('value', value)
+    fd.append('action', action)
+    // Still send confidence to the server, but don't display it in UI
+    if (typeof confidence === 'number') fd.append('confidence', String(confidence))
+    fd.append('content_hash', lastContentHash.current)
+    fetch('/api/ai-suggestions/feedback', { method: 'POST', body: fd }).catch(() => {})
   }
+  const onAcceptAI = (field: 'tag' | 'source', value: string, confidence?: number) =>
+    sendAIFeedback('accepted', field, value, confidence)
+  const onDeclineAI = (field: 'tag' | 'source', value: string, confidence?: number) =>
+    sendAIFeedback('declined', field, value, confidence)
 
   const renderInlineMarkdown = (text: string) => {
     if (!text) return ''
@@ -266,21 +279,14 @@ const CaptureForm: React.FC<Props> = (p) => {
 
   return (
     <div className="form">
-      <div className="note-id-container" style={{ marginBottom: '10px', display: 'flex', alignItems: 'center' }}>
-        <div style={{ flex: 1 }}>
-          <span style={{ fontSize: '12px', color: '#666' }}>Note ID:</span>
-          <span style={{ fontFamily: 'monospace', padding: '0 5px', fontSize: '14px' }}>{p.noteId}</span>
+      <div className="note-id-container" style={styles.noteIdRow}>
+        <div style={styles.grow}>
+          <span style={styles.noteIdLabel}>Note ID:</span>
+          <span style={styles.noteIdValue}>{p.noteId}</span>
         </div>
         <button 
           onClick={copyNoteIdToClipboard}
-          style={{
-            background: 'none',
-            border: '1px solid #ccc',
-            borderRadius: '4px',
-            padding: '2px 8px',
-            cursor: 'pointer',
-            fontSize: '12px'
-          }}
+          style={styles.copyButton}
         >
           Copy ID
         </button>
@@ -347,24 +353,16 @@ const CaptureForm: React.FC<Props> = (p) => {
           />
         </div>
       </div>
-      <div className="alias-container" style={{ marginTop: '15px', display: 'flex', alignItems: 'center' }}>
+      <div className="alias-container" style={styles.aliasRow}>
         <input
           value={p.alias}
           onChange={(e) => p.setAlias(e.target.value)}
           placeholder="Add an alias for this note..."
-          style={{ flex: 1, padding: '8px', borderRadius: '4px', border: '1px solid #ccc' }}
+          style={styles.aliasInput}
         />
         <button 
           onClick={generateAliasOptions}
-          style={{
-            marginLeft: '10px',
-            background: '#f0f0f0',
-            border: '1px solid #ccc',
-            borderRadius: '4px',
-            padding: '8px 12px',
-            cursor: 'pointer',
-            fontSize: '12px'
-          }}
+          style={styles.suggestButton}
           title="Generate alias suggestions based on content"
         >
           Suggest
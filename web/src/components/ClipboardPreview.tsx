@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from 'react'
+import React, { useEffect, useMemo, useState } from 'react'
 
 const ClipboardPreview: React.FC<{ intervalMs: number }> = ({ intervalMs }) => {
   const [text, setText] = useState<string>('')
@@ -6,6 +6,7 @@ const ClipboardPreview: React.FC<{ intervalMs: number }> = ({ intervalMs }) => {
   useEffect(() => {
     let mounted = true
     let t: any
+    let busy = false
     const read = async () => {
       try {
         const response = await fetch('/api/clipboard')
@@ -15,14 +16,31 @@ const ClipboardPreview: React.FC<{ intervalMs: number }> = ({ intervalMs }) => {
         if (mounted) setText('')
       }
     }
+    // Each read spawns wl-paste on the server, so skip polling while the window is hidden
     const loop = () => {
-      read().finally(() => { t = setTimeout(loop, intervalMs) })
+      if (document.hidden) { t = setTimeout(loop, intervalMs); return }
+      busy = true
+      read().finally(() => { busy = false; if (mounted) t = setTimeout(loop, intervalMs) })
+    }
+    const onVisible = () => {
+      if (document.hidden || busy) return
+      if (t) clearTimeout(t)
+      loop()
     }
     loop()
-    return () => { mounted = false; if (t) clearTimeout(t) }
+    document.addEventListener('visibilitychange', onVisible)
+    return () => {
+      mounted = false
+      if (t) clearTimeout(t)
+      document.removeEventListener('visibilitychange', onVisible)
+    }
   }, [intervalMs])
 
-  const firstLine = (text || '').split('\n')[0] || ''
+  // Only the first line is shown, so find it instead of splitting the whole clipboard
+  const firstLine = useMemo(() => {
+    const nl = text.indexOf('\n')
+    return nl === -1 ? text : text.slice(0, nl)
+  }, [text])
   return (
     <div className="clipboard">
       <div className="title">Clipboard Preview</div>
@@ -33,4 +51,4 @@ const ClipboardPreview: React.FC<{ intervalMs: number }> = ({ intervalMs }) => {
   )
 }
 
-export default ClipboardPreview
+export default React.memo(ClipboardPreview)
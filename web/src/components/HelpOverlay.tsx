@@ -1,5 +1,15 @@
 import React from 'react'
 
+// Built once at module load; a JSX text child would also collapse the newlines
+const HELP_TEXT = [
+  'Ctrl+Enter save',
+  'Ctrl+1..9 toggle modalities',
+  'Tab/Shift+Tab navigate inputs',
+  'ESC normal mode / clear',
+  'C context mode (from normal)',
+  'F1 toggle help',
+].join('\n')
+
 const HelpOverlay: React.FC<{ onClose: () => void }> = ({ onClose }) => {
   return (
     <div className="help">
@@ -8,14 +18,7 @@ const HelpOverlay: React.FC<{ onClose: () => void }> = ({ onClose }) => {
           <span>Help</span>
           <button onClick={onClose}>Close</button>
         </div>
-        <pre>
-Ctrl+Enter save
-Ctrl+1..9 toggle modalities
-Tab/Shift+Tab navigate inputs
-ESC normal mode / clear
-C context mode (from normal)
-F1 toggle help
-        </pre>
+        <pre>{HELP_TEXT}</pre>
       </div>
     </div>
   )
@@ -7,7 +7,8 @@ type Props = {
   useIcons?: boolean
 }
 
-const all = ['text','clipboard','screenshot','audio','system-audio']
+// Order matters: Ctrl+1..5 toggle these by position
+export const MODALITIES = ['text','clipboard','screenshot','audio','system-audio']
 
 const modalityIcons: Record<string, string> = {
   text: '📝',
@@ -17,21 +18,31 @@ const modalityIcons: Record<string, string> = {
   'system-audio': '🔊'
 }
 
+// Labels and tooltips never change, so build them once for both display styles
+const labels = MODALITIES.map((m, i) => ({
+  m,
+  text: { label: m, title: `Ctrl+${i+1}` },
+  icon: { label: modalityIcons[m] || m, title: `${m} (Ctrl+${i+1})` }
+}))
+
 const ModalityBar: React.FC<Props> = ({ modalities, onToggle, onScreenshot, useIcons = false }) => {
   return (
     <div className="mods">
-      {all.map((m, i) => (
-        <button
-          key={m}
-          className={modalities.includes(m) ? 'active' : ''}
-          onClick={() => m === 'screenshot' ? onScreenshot() : onToggle(m)}
-          title={useIcons ? `${m} (Ctrl+${i+1})` : `Ctrl+${i+1}`}
-        >
-          {useIcons ? modalityIcons[m] || m : m}
-        </button>
-      ))}
+      {labels.map(({ m, text, icon }) => {
+        const { label, title } = useIcons ? icon : text
+        return (
+          <button
+            key={m}
+            className={modalities.includes(m) ? 'active' : ''}
+            onClick={() => m === 'screenshot' ? onScreenshot() : onToggle(m)}
+            title={title}
+          >
+            {label}
+          </button>
+        )
+      })}
     </div>
   )
 }
 
-export default ModalityBar
+export default React.memo(ModalityBar)